@@ -10,9 +10,12 @@ import re
 import smtplib
 import sys
 import time
+from collections import Counter
 from datetime import date, datetime
 from email.message import EmailMessage
+from functools import lru_cache
 from io import BytesIO
+from itertools import chain
 from pathlib import Path
 from typing import Any, Iterable, Mapping
 
@@ -23,6 +26,13 @@ from openai import OpenAI
 from werkzeug.datastructures import FileStorage
 from werkzeug.utils import secure_filename
 
+try:
+    from pyairtable import Table as _AirtableTable
+
+    _PYAIRTABLE_OK = True
+except ImportError:  # pragma: no cover - depends on optional dependency
+    _PYAIRTABLE_OK = False
+
 load_dotenv()
 
 ROOT_DIR = Path(__file__).resolve().parent.parent
@@ -101,6 +111,11 @@ def _configure_cloudinary() -> bool:
 # Structural change: configure Cloudinary once at import time.
 CLOUDINARY_ENABLED = _configure_cloudinary()
 
+# Probe bodies are serialized once; each request still gets its own Response so
+# after_request hooks (CORS) never mutate shared state.
+_HEALTH_BODY = b'{"status":"ok"}\n'
+_VERSION_BODY = b'{"version":"1.3.0"}\n'
+
 
 def _parse_airtable_url(url: str | None) -> tuple[str | None, str | None]:
     """Extract base (app...) and table (tbl...) IDs from an Airtable UI URL."""
@@ -117,8 +132,8 @@ def get_airtable_table() -> Any:
     """Return a pyairtable Table configured from environment variables."""
     if not AIRTABLE_API_KEY:
         raise RuntimeError("Missing Airtable env var: AIRTABLE_API_KEY")
-
-    from pyairtable import Table
+    if not _PYAIRTABLE_OK:
+        raise RuntimeError("Airtable access requires pyairtable. Install it: pip install pyairtable")
 
     parsed_base = parsed_tbl = None
     if AIRTABLE_URL:
@@ -136,14 +151,13 @@ def get_airtable_table() -> Any:
             "Missing Airtable table. Set AIRTABLE_TABLE_ID, AIRTABLE_TABLE_NAME, or AIRTABLE_URL."
         )
 
-    return Table(AIRTABLE_API_KEY, base_id, table_segment)
+    return _AirtableTable(AIRTABLE_API_KEY, base_id, table_segment)
 
 
 # Structural change: consolidated period parsing shared by multiple routes.
 def _current_period() -> str:
     """Return the current year-month period in YYYY-MM format."""
-    today = date.today()
-    return f"{today.year:04d}-{today.month:02d}"
+    return date.today().strftime("%Y-%m")
 
 
 def _period_from_request(*, allow_body: bool = False, allow_parts: bool = False) -> str:
@@ -161,11 +175,12 @@ def _period_from_request(*, allow_body: bool = False, allow_parts: bool = False)
         if isinstance(raw_period, str):
             period = raw_period
     if not period and allow_parts:
-        year = (request.args.get("year") or str(date.today().year)).zfill(4)
+        today = date.today()
+        year = (request.args.get("year") or str(today.year)).zfill(4)
         month_value = (
             request.args.get("monthNum")
             or request.args.get("m")
-            or str(date.today().month)
+            or str(today.month)
         )
         period = f"{year}-{str(month_value).zfill(2)}"
     return period or _current_period()
@@ -248,6 +263,20 @@ def _parse_amount(raw: str | None) -> float:
         raise ValueError("Amount must be a number") from exc
 
 
+_SAFE_FILENAME_TRANS = str.maketrans({" ": "_"})
+
+
+def _write_bytes(path: Path, data: bytes) -> None:
+    """Write a file with a single unbuffered fd, bypassing the io layer."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_CLOEXEC", 0), 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
 # Structural change: unified receipt storage for local and Cloudinary providers.
 def _store_receipt(image: FileStorage, img_bytes: bytes) -> tuple[str | None, list[dict[str, Any]] | None]:
     """Persist the uploaded receipt and return the public URL and Airtable attachment payload."""
@@ -265,13 +294,10 @@ def _store_receipt(image: FileStorage, img_bytes: bytes) -> tuple[str | None, li
         image_url = upload_res.get("secure_url") or upload_res.get("url")
         return image_url, ([{"url": image_url}] if image_url else None)
 
-    filename = secure_filename(image.filename or "receipt")
-    name_root, ext = os.path.splitext(filename)
-    safe_root = name_root.replace(" ", "_") or "receipt"
-    final_name = f"{int(time.time() * 1000)}_{safe_root}{ext}"
+    stem, ext = os.path.splitext(secure_filename(image.filename or "receipt"))
+    final_name = f"{time.time_ns() // 1_000_000}_{(stem or 'receipt').translate(_SAFE_FILENAME_TRANS)}{ext}"
     save_path = UPLOAD_DIR / final_name
-    with open(save_path, "wb") as fh:
-        fh.write(img_bytes)
+    _write_bytes(save_path, img_bytes)
     image_url = build_public_url(f"/uploads/{final_name}")
     return image_url, ([{"url": image_url}])
 
@@ -351,9 +377,9 @@ def _cf_email_from_request() -> str | None:
 
 
 @app.route("/version")
-def version() -> dict[str, str]:
+def version() -> Response:
     """Return the backend version."""
-    return {"version": "1.3.0"}
+    return app.response_class(_VERSION_BODY, mimetype="application/json")
 
 
 @app.post("/api/expenses")
@@ -379,7 +405,8 @@ def create_expense():
         attendees = request.form.get("attendees", "")
         occasion = request.form.get("occasion", "")
         payment_method = request.form.get("payment_method", "")
-        date_str = request.form.get("date") or date.today().isoformat()
+        today_iso = date.today().isoformat()
+        date_str = request.form.get("date") or today_iso
         category = (request.form.get("category") or "Uncategorized").strip()
         reimburse_to = (request.form.get("reimburse_to") or "None").strip() or "None"
 
@@ -411,7 +438,7 @@ def create_expense():
             "Occasion": occasion,
             "Payment": payment_method,
             "Date": date_str,
-            "Date added": date.today().isoformat(),
+            "Date added": today_iso,
             "Category": category,
             "Reimburse to": reimburse_to,
             "Status": "Under Review",
@@ -487,9 +514,9 @@ def report_page():
 
 
 @app.get("/healthz")
-def healthz() -> dict[str, str]:
+def healthz() -> Response:
     """Liveness probe used by deployment platforms."""
-    return {"status": "ok"}
+    return app.response_class(_HEALTH_BODY, mimetype="application/json")
 
 
 @app.errorhandler(404)
@@ -521,10 +548,11 @@ def list_expenses():
         month = _period_from_request()
         formula = f"DATETIME_FORMAT({{Date added}}, 'YYYY-MM') = '{month}'"
         table = get_airtable_table()
-        records = table.all(formula=formula)
+        pages = table.iterate(formula=formula, page_size=100)
 
         items = []
-        for record in records:
+        hash_counts: Counter[str] = Counter()
+        for record in chain.from_iterable(pages):
             fields = record.get("fields", {})
             legacy_approved = fields.get("Approved")
             status_val = fields.get("Status")
@@ -554,12 +582,9 @@ def list_expenses():
                     "uploaded_by": fields.get("Uploaded By"),
                 }
             )
+            if fields.get("Hash"):
+                hash_counts[fields["Hash"]] += 1
 
-        hash_counts: dict[str, int] = {}
-        for item in items:
-            file_hash = item.get("hash")
-            if file_hash:
-                hash_counts[file_hash] = hash_counts.get(file_hash, 0) + 1
         for item in items:
             file_hash = item.get("hash")
             count = hash_counts.get(file_hash or "", 0)
@@ -778,6 +803,10 @@ def _split_date_time(value: Any) -> tuple[str, str]:
 
 def _round2(value: float | int | None) -> float:
     """Round values to two decimals without raising."""
+    if value is None:
+        return 0.0
+    if isinstance(value, float):
+        return round(value, 2)
     try:
         return round(float(value or 0), 2)
     except Exception:  # pragma: no cover - defensive guard
@@ -807,7 +836,7 @@ def _build_monthly_report(period: str, *, include_statuses: list[str] | None = N
 
     currency_buckets: dict[str, dict[str, Any]] = {}
     rows: list[dict[str, Any]] = []
-    fx_rates = _fx_rates_chf()
+    fx_policy = _fx_policy_description(_fx_rates_chf())
 
     for record in records:
         fields = record.get("fields", {})
@@ -860,13 +889,17 @@ def _build_monthly_report(period: str, *, include_statuses: list[str] | None = N
         bucket["totals"]["net"] += net_amt
         bucket["totals"]["vat"] += vat_amt
 
-        bucket["byCategory"][category] = bucket["byCategory"].get(category, 0.0) + gross
-        bucket["byPaymentMethod"][payment] = bucket["byPaymentMethod"].get(payment, 0.0) + gross
+        by_category = bucket["byCategory"]
+        by_category[category] = by_category.get(category, 0.0) + gross
+        by_payment = bucket["byPaymentMethod"]
+        by_payment[payment] = by_payment.get(payment, 0.0) + gross
 
-        if payment.lower().startswith("company"):
+        payment_key = payment.lower()
+        if payment_key.startswith("company"):
             bucket["companyCardCharged"] += gross
-        if payment.lower() in {"personal", "cash"}:
-            bucket["reimbursementsByEmployee"][payer] = bucket["reimbursementsByEmployee"].get(payer, 0.0) + gross
+        elif payment_key in {"personal", "cash"}:
+            reimbursements = bucket["reimbursementsByEmployee"]
+            reimbursements[payer] = reimbursements.get(payer, 0.0) + gross
 
         attendees_val = _stringify_many(fields.get("Attendees"))
         name_val = _stringify_many(fields.get("Name"))
@@ -906,7 +939,7 @@ def _build_monthly_report(period: str, *, include_statuses: list[str] | None = N
                 "currency": cur,
                 "status": status,
                 "receiptUrl": receipt_url,
-                "fxPolicy": _fx_policy_description(fx_rates),
+                "fxPolicy": fx_policy,
             }
         )
 
@@ -914,7 +947,7 @@ def _build_monthly_report(period: str, *, include_statuses: list[str] | None = N
         "period": period,
         "rows": rows,
         "currencyBuckets": currency_buckets,
-        "fxPolicy": _fx_policy_description(fx_rates),
+        "fxPolicy": fx_policy,
     }
 
 
@@ -986,14 +1019,60 @@ def _prepare_export_rows(report: dict[str, Any]) -> list[dict[str, Any]]:
     return rows
 
 
+@lru_cache(maxsize=1)
+def _raw_pdf_styles() -> tuple[Any, Any, Any]:
+    """Return the (cell, header, link) paragraph styles shared by raw PDF exports."""
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+
+    base_style = ParagraphStyle(
+        "TableCell",
+        parent=getSampleStyleSheet()["BodyText"],
+        fontName="Helvetica",
+        fontSize=9,
+        leading=11,
+        spaceAfter=0,
+        spaceBefore=0,
+    )
+    header_style = ParagraphStyle(
+        "TableHeader",
+        parent=base_style,
+        fontName="Helvetica-Bold",
+    )
+    link_style = ParagraphStyle(
+        "TableLink",
+        parent=base_style,
+        wordWrap="CJK",
+    )
+    return base_style, header_style, link_style
+
+
+@lru_cache(maxsize=1)
+def _raw_table_style() -> Any:
+    """Return the TableStyle shared by raw PDF exports; it is never mutated after creation."""
+    from reportlab.lib import colors
+    from reportlab.platypus import TableStyle
+
+    return TableStyle(
+        [
+            ("FONT", (0, 0), (-1, 0), "Helvetica-Bold"),
+            ("FONT", (0, 1), (-1, -1), "Helvetica"),
+            ("FONTSIZE", (0, 0), (-1, -1), 9),
+            ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+            ("TOPPADDING", (0, 0), (-1, -1), 4),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
+            ("GRID", (0, 0), (-1, -1), 0.25, colors.black),
+        ]
+    )
+
+
 def render_raw_report_pdf(report: dict[str, Any]) -> bytes:
     """Render a minimal PDF containing a raw table of transactions."""
     try:
-        from reportlab.lib import colors
         from reportlab.lib.pagesizes import A4
-        from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+        from reportlab.lib.styles import ParagraphStyle
         from reportlab.lib.units import mm
-        from reportlab.platypus import Paragraph, SimpleDocTemplate, Table, TableStyle
+        from reportlab.platypus import Paragraph, SimpleDocTemplate, Table
     except Exception as exc:  # pragma: no cover - depends on optional dependency
         raise RuntimeError("Raw PDF export requires reportlab. Install it: pip install reportlab") from exc
 
@@ -1010,25 +1089,7 @@ def render_raw_report_pdf(report: dict[str, Any]) -> bytes:
         bottomMargin=16 * mm,
     )
 
-    base_style = ParagraphStyle(
-        "TableCell",
-        parent=getSampleStyleSheet()["BodyText"],
-        fontName="Helvetica",
-        fontSize=9,
-        leading=11,
-        spaceAfter=0,
-        spaceBefore=0,
-    )
-    header_style = ParagraphStyle(
-        "TableHeader",
-        parent=base_style,
-        fontName="Helvetica-Bold",
-    )
-    link_style = ParagraphStyle(
-        "TableLink",
-        parent=base_style,
-        wordWrap="CJK",
-    )
+    base_style, header_style, link_style = _raw_pdf_styles()
 
     def _format_amount(value: Any) -> str:
         return "" if value in (None, "") else f"{float(value):.2f}"
@@ -1049,24 +1110,22 @@ def render_raw_report_pdf(report: dict[str, Any]) -> bytes:
         escaped_text = escape(url_text).replace("\n", "<br/>")
         return Paragraph(f'<a href="{escaped_attr}">{escaped_text}</a>', link_style)
 
-    data: list[list[Paragraph]] = []
-    data.append([_to_paragraph(column, header_style) for column in RAW_EXPORT_COLUMNS])
-
-    for item in export_rows:
-        data.append(
-            [
-                _to_paragraph(item["Name"]),
-                _to_paragraph(_format_amount(item["Amount Gross"])),
-                _to_paragraph(_format_amount(item["Amount Net"])),
-                _to_paragraph(item["Attendees"]),
-                _to_paragraph(item["Payment Method"]),
-                _to_paragraph(_format_amount(item["VAT"])),
-                _to_paragraph(item["Date"]),
-                _to_paragraph(item["Time"]),
-                _to_paragraph(item["Currency"]),
-                _link_paragraph(item["Receipt Link"]),
-            ]
-        )
+    data: list[list[Paragraph]] = [[_to_paragraph(column, header_style) for column in RAW_EXPORT_COLUMNS]]
+    data.extend(
+        [
+            _to_paragraph(item["Name"]),
+            _to_paragraph(_format_amount(item["Amount Gross"])),
+            _to_paragraph(_format_amount(item["Amount Net"])),
+            _to_paragraph(item["Attendees"]),
+            _to_paragraph(item["Payment Method"]),
+            _to_paragraph(_format_amount(item["VAT"])),
+            _to_paragraph(item["Date"]),
+            _to_paragraph(item["Time"]),
+            _to_paragraph(item["Currency"]),
+            _link_paragraph(item["Receipt Link"]),
+        ]
+        for item in export_rows
+    )
 
     if len(data) == 1:
         empty_row = [_to_paragraph("No expenses found")] + [
@@ -1077,20 +1136,7 @@ def render_raw_report_pdf(report: dict[str, Any]) -> bytes:
     num_columns = len(RAW_EXPORT_COLUMNS)
     column_width = doc.width / num_columns
     table = Table(data, colWidths=[column_width] * num_columns, repeatRows=1)
-    table.setStyle(
-        TableStyle(
-            [
-                ("FONT", (0, 0), (-1, 0), "Helvetica-Bold"),
-                ("FONT", (0, 1), (-1, -1), "Helvetica"),
-                ("FONTSIZE", (0, 0), (-1, -1), 9),
-                ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                ("VALIGN", (0, 0), (-1, -1), "TOP"),
-                ("TOPPADDING", (0, 0), (-1, -1), 4),
-                ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
-                ("GRID", (0, 0), (-1, -1), 0.25, colors.black),
-            ]
-        )
-    )
+    table.setStyle(_raw_table_style())
 
     doc.build([table])
     return buffer.getvalue()
@@ -1221,7 +1267,8 @@ def send_summary_email():
         return jsonify({"ok": False, "error": "No authenticated user email from SSO"}), 401
 
     recipients = [current_email]
-    subject = f"Expense Report {report['period']} — rows: {len(report.get('rows', []))}"
+    rows = report.get("rows", [])
+    subject = f"Expense Report {report['period']} — rows: {len(rows)}"
 
     try:
         import threading
@@ -1236,12 +1283,12 @@ def send_summary_email():
         except Exception as exc:
             return jsonify({"ok": False, "error": str(exc)}), 500
 
-    total = sum((row.get("gross") or 0) for row in report.get("rows", []))
+    total = sum((row.get("gross") or 0) for row in rows)
     return jsonify(
         {
             "ok": True,
             "month": report["period"],
-            "count": len(report.get("rows", [])),
+            "count": len(rows),
             "total": _round2(total),
             "queued": True,
         }
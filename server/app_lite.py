@@ -4,7 +4,9 @@ from datetime import date
 from pathlib import Path
 import random
 import hashlib
+from collections import Counter
 from io import BytesIO
+from itertools import chain
 
 from flask import Flask, request, jsonify, send_from_directory
 from flask_cors import CORS
@@ -12,6 +14,12 @@ from werkzeug.utils import secure_filename
 from dotenv import load_dotenv
 import re
 
+try:
+    from pyairtable import Table as _Table
+    _PYAIRTABLE_OK = True
+except ImportError:
+    _PYAIRTABLE_OK = False
+
 load_dotenv()
 
 # Paths
@@ -43,6 +51,7 @@ DEFAULT_CURRENCY = os.getenv("DEFAULT_CURRENCY") or "Euro"
 FX_RATES_CHF_JSON = os.getenv("FX_RATES_CHF_JSON")
 
 ALLOWED_STATUSES = ["Done", "In-Progress", "Under Review"]
+_SAFE_TRANS = str.maketrans({" ": "_"})
 
 
 def _parse_airtable_url(url: str):
@@ -56,7 +65,8 @@ def _parse_airtable_url(url: str):
 def get_airtable_table():
     if not AIRTABLE_API_KEY:
         raise RuntimeError("Missing AIRTABLE_API_KEY")
-    from pyairtable import Table
+    if not _PYAIRTABLE_OK:
+        raise RuntimeError("Airtable access requires pyairtable. Install it: pip install pyairtable")
     parsed_base, parsed_tbl = (None, None)
     if AIRTABLE_URL:
         parsed_base, parsed_tbl = _parse_airtable_url(AIRTABLE_URL)
@@ -64,7 +74,7 @@ def get_airtable_table():
     if not base_id:
         raise RuntimeError("Missing Airtable base. Set AIRTABLE_BASE_ID or AIRTABLE_URL.")
     table_segment = AIRTABLE_TABLE_ID or parsed_tbl or AIRTABLE_TABLE_NAME
-    return Table(AIRTABLE_API_KEY, base_id, table_segment)
+    return _Table(AIRTABLE_API_KEY, base_id, table_segment)
 
 
 def build_public_url(path_segment: str) -> str:
@@ -95,13 +105,18 @@ def _to_chf(amount: float, currency: str | None) -> float:
         return round(float(amount or 0), 2)
 
 
+# Pre-serialized probe bodies
+_HEALTH_BODY = b'{"status":"ok"}\n'
+_VERSION_BODY = b'{"version":"2.0.0"}\n'
+
+
 @app.get("/healthz")
 def healthz():
-    return {"status": "ok"}
+    return app.response_class(_HEALTH_BODY, mimetype="application/json")
 
 @app.get("/version")
 def version():
-    return {"version": "2.0.0"}
+    return app.response_class(_VERSION_BODY, mimetype="application/json")
 
 @app.get("/")
 def index():
@@ -123,6 +138,16 @@ def uploads(filename):
     return send_from_directory(UPLOAD_DIR, filename)
 
 
+def _write_bytes(path: Path, data: bytes) -> None:
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_CLOEXEC", 0), 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
 def _norm_currency(x: str | None) -> str | None:
     if not x:
         return None
@@ -165,7 +190,8 @@ def create_expense():
         attendees = request.form.get("attendees", "")
         occasion = request.form.get("occasion", "")
         payment_method = request.form.get("payment_method", "")
-        date_str = request.form.get("date") or date.today().isoformat()
+        today_iso = date.today().isoformat()
+        date_str = request.form.get("date") or today_iso
         category = (request.form.get("category") or "Uncategorized").strip()
         reimburse_to = (request.form.get("reimburse_to") or "None").strip() or "None"
 
@@ -175,13 +201,10 @@ def create_expense():
         random_id = str(random.randint(1_000_000, 9_999_999))
 
         # Save image locally
-        filename = secure_filename(image.filename)
-        name_root, ext = os.path.splitext(filename)
-        safe_root = name_root.replace(" ", "_") or "receipt"
-        final_name = f"{int(time.time()*1000)}_{safe_root}{ext}"
+        stem, ext = os.path.splitext(secure_filename(image.filename))
+        final_name = f"{time.time_ns() // 1_000_000}_{(stem or 'receipt').translate(_SAFE_TRANS)}{ext}"
         save_path = UPLOAD_DIR / final_name
-        with open(save_path, "wb") as f:
-            f.write(img_bytes)
+        _write_bytes(save_path, img_bytes)
         image_url = build_public_url(f"/uploads/{final_name}")
         attachment = [{"url": image_url}]
 
@@ -199,7 +222,7 @@ def create_expense():
             "Occasion": occasion,
             "Payment": payment_method,
             "Date": date_str,
-            "Date added": date.today().isoformat(),
+            "Date added": today_iso,
             "Category": category,
             "Reimburse to": reimburse_to,
             "Status": "Under Review",
@@ -217,13 +240,10 @@ def create_expense():
 @app.get("/api/expenses")
 def list_expenses():
     try:
-        month = request.args.get("month")
-        if not month:
-            today = date.today()
-            month = f"{today.year:04d}-{today.month:02d}"
+        month = request.args.get("month") or date.today().strftime("%Y-%m")
         formula = f"DATETIME_FORMAT({{Date added}}, 'YYYY-MM') = '{month}'"
         table = get_airtable_table()
-        records = table.all(formula=formula)
+        pages = table.iterate(formula=formula, page_size=100)
 
         def first_url(attachments):
             try:
@@ -234,7 +254,8 @@ def list_expenses():
             return None
 
         items = []
-        for r in records:
+        hash_counts: Counter[str] = Counter()
+        for r in chain.from_iterable(pages):
             f = r.get("fields", {})
             legacy_approved = f.get("Approved")
             status_val = f.get("Status")
@@ -258,13 +279,10 @@ def list_expenses():
                 "receipt_url": first_url(f.get("Receipt")),
                 "hash": f.get("Hash"),
             })
+            if f.get("Hash"):
+                hash_counts[f["Hash"]] += 1
 
         # Duplicate detection by hash
-        hash_counts: dict[str, int] = {}
-        for it in items:
-            h = it.get("hash")
-            if h:
-                hash_counts[h] = hash_counts.get(h, 0) + 1
         for it in items:
             h = it.get("hash")
             cnt = hash_counts.get(h or "", 0)
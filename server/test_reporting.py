@@ -1,10 +1,16 @@
+import base64
+import os
 import sys
+import tempfile
 import unittest
+from io import BytesIO
 from pathlib import Path
+from unittest import mock
 
 sys.path.insert(0, str(Path(__file__).resolve().parent))
 
-from reporting import buildTables, formatCHF, percent, summarizeForAI
+import reporting
+from reporting import SUMMARY_FALLBACK, buildTables, formatCHF, percent, render_error_pdf, summarizeForAI
 
 
 class DummyChoice:
@@ -30,6 +36,12 @@ class DummyClient:
         self.chat = type('Chat', (), {'completions': DummyCompletions(content)})()
 
 
+# 2x2 white PNG.
+TINY_PNG = base64.b64decode(
+    'iVBORw0KGgoAAAANSUhEUgAAAAIAAAACCAIAAAD91JpzAAAAFklEQVR4nGP8//8/AwMDEwMDAwMDAwAkBgMB/DXemwAAAABJRU5ErkJggg=='
+)
+
+
 class ReportingHelpersTest(unittest.TestCase):
     def test_format_chf(self):
         self.assertEqual(formatCHF(1234.5), "CHF 1'234.50")
@@ -39,8 +51,112 @@ class ReportingHelpersTest(unittest.TestCase):
         self.assertEqual(percent(50, 200), '25.0%')
         self.assertEqual(percent(0, 0), '0.0%')
 
-    def test_build_tables_converts_to_chf(self):
+    def test_summarize_for_ai_uses_client(self):
+        metrics = {
+            'period': '2024-05',
+            'totals': {'grossCHF': 100.0, 'companyCardSpentCHF': 60.0},
+            'topCategory': ('Meals', 70.0),
+            'topOwed': [('Bob', 30.0)],
+            'pending': {'inProgress': {'count': 1, 'amount': 10.0}, 'underReview': {'count': 0, 'amount': 0.0}},
+        }
+        client = DummyClient('Summary text here.')
+        summary = summarizeForAI(metrics, client=client)
+        self.assertEqual(summary, 'Summary text here.')
+
+    def test_summarize_for_ai_without_key_falls_back(self):
+        with mock.patch.dict(os.environ, {'OPENAI_API_KEY': ''}):
+            self.assertEqual(summarizeForAI({'period': '2024-05'}), SUMMARY_FALLBACK)
+
+    @unittest.skipUnless(reporting._REPORTLAB_OK, 'reportlab not installed')
+    def test_render_error_pdf_writes_to_stream(self):
+        out = BytesIO()
+        self.assertIsNone(render_error_pdf('boom', out=out))
+        self.assertTrue(out.getvalue().startswith(b'%PDF'))
+
+    @unittest.skipUnless(reporting._REPORTLAB_OK, 'reportlab not installed')
+    def test_render_report_pdf_writes_to_stream(self):
         report = {
+            'period': '2024-05',
+            'rows': [
+                {
+                    'date': '2024-05-01',
+                    'payer': 'Alice',
+                    'category': 'Meals',
+                    'paymentMethod': 'Personal',
+                    'gross': 100,
+                    'net': 92,
+                    'vat': 8,
+                    'currency': 'CHF',
+                    'status': 'Done',
+                    'receiptUrl': 'https://example.com/receipt.png',
+                },
+            ],
+        }
+        out = BytesIO()
+        with mock.patch('reporting._logo_bytes', return_value=None), \
+                mock.patch('reporting.summarizeForAI', return_value=SUMMARY_FALLBACK):
+            self.assertIsNone(reporting.render_report_pdf(report, out=out))
+        self.assertTrue(out.getvalue().startswith(b'%PDF'))
+
+    @unittest.skipUnless(reporting._REPORTLAB_OK, 'reportlab not installed')
+    def test_simple_table_wraps_long_cells(self):
+        styles = reporting._load_styles(*reporting._register_fonts())
+        long_name = 'Travel & Accommodation International Conferences'
+        table = reporting._simple_table(['Category', 'Gross', '% of total'], [[long_name, 'CHF 1.00', '50.0%']], styles, 450)
+        self.assertIsInstance(table._cellvalues[1][0], reporting.Paragraph)
+        self.assertEqual(table._cellvalues[1][1], 'CHF 1.00')
+        table.wrap(450, 800)
+        self.assertGreater(table._rowHeights[1], table._rowHeights[0])
+
+    @unittest.skipUnless(reporting._REPORTLAB_OK, 'reportlab not installed')
+    def test_bar_charts_skip_series_without_positive_values(self):
+        refunds = (-12.5, -3.0)
+        self.assertIsNone(reporting._bar_chart(('A', 'B'), refunds, 'Title', 300, 200, 'Helvetica'))
+        self.assertIsNone(reporting._spark_bar_chart(('A', 'B'), refunds, 300, 120, 'Helvetica'))
+        self.assertIsNotNone(reporting._bar_chart(('A', 'B'), (5.0, -1.0), 'Title', 300, 200, 'Helvetica'))
+
+    @unittest.skipUnless(reporting._REPORTLAB_OK, 'reportlab not installed')
+    def test_numbered_canvas_keeps_per_page_ext_gstate(self):
+        out = BytesIO()
+        numbered = reporting._NumberedCanvas(reporting.canvas.Canvas(out, pageCompression=0), 'Footer', 20, 20, 'Helvetica')
+        numbered.setFillAlpha(0.3)
+        numbered.rect(10, 10, 50, 50, fill=1)
+        numbered.showPage()
+        numbered.drawString(10, 10, 'second page')
+        numbered.showPage()
+        numbered.save()
+        pdf = out.getvalue()
+        self.assertIn(b'/ExtGState', pdf)
+        self.assertIn(b'/ca .3', pdf)
+        self.assertEqual(pdf.count(b'page 1 of 2') + pdf.count(b'page 2 of 2'), 2)
+
+    @unittest.skipUnless(reporting._REPORTLAB_OK, 'reportlab not installed')
+    def test_logo_cache_rejects_non_image_bytes(self):
+        png = TINY_PNG
+        with tempfile.TemporaryDirectory() as tmp, mock.patch('reporting.CACHE_DIR', Path(tmp)):
+            cache_path = Path(tmp) / reporting.hashlib.sha256(reporting.LOGO_URL.encode('utf-8')).hexdigest()
+            reporting._logo_bytes.cache_clear()
+            with mock.patch('reporting.urlopen', return_value=BytesIO(b'<html>Bad gateway</html>')):
+                self.assertIsNone(reporting._logo_bytes())
+            self.assertFalse(cache_path.exists())
+
+            # A corrupt cached file is a miss: refetch and overwrite it.
+            cache_path.write_bytes(png[:20])
+            reporting._logo_bytes.cache_clear()
+            with mock.patch('reporting.urlopen', return_value=BytesIO(png)):
+                self.assertEqual(reporting._logo_bytes(), png)
+            self.assertEqual(cache_path.read_bytes(), png)
+        reporting._logo_bytes.cache_clear()
+
+    def test_render_error_pdf_joins_message_parts(self):
+        with mock.patch('reporting._REPORTLAB_OK', False):
+            self.assertEqual(render_error_pdf(['boom', ': ', 'détail']), 'boom: détail'.encode('utf-8'))
+
+
+class BuildTablesTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.report = {
             'period': '2024-05',
             'rows': [
                 {
@@ -92,8 +208,10 @@ class ReportingHelpersTest(unittest.TestCase):
             'fxPolicy': 'Test policy',
         }
 
-        tables = buildTables(report)
+        cls.tables = buildTables(cls.report)
 
+    def test_build_tables_converts_to_chf(self):
+        tables = self.tables
         self.assertEqual(tables['totals']['grossCHF'], 282.0)
         self.assertEqual(tables['totals']['netCHF'], 255.6)
         self.assertEqual(tables['totals']['vatCHF'], 26.4)
@@ -104,21 +222,12 @@ class ReportingHelpersTest(unittest.TestCase):
         self.assertEqual(len(tables['rowsCHF']), 4)
         self.assertEqual(tables['rowsCHF'][0]['amountCHF'], 90.0)
         self.assertEqual(tables['rowsCHF'][1]['amountCHF'], 192.0)
+        self.assertEqual(tables['rowsCHF'][0]['originalDisplay'], '100.00 USD')
         self.assertEqual(tables['topCategory'], ('Travels', 192.0))
+        self.assertEqual(tables['byCategoryNames'], ('Travels', 'Meals'))
+        self.assertEqual(tables['byCategoryAmounts'], (192.0, 90.0))
         self.assertEqual(tables['reimbursements'], [('Bob', 192.0)])
 
-    def test_summarize_for_ai_uses_client(self):
-        metrics = {
-            'period': '2024-05',
-            'totals': {'grossCHF': 100.0, 'companyCardSpentCHF': 60.0},
-            'topCategory': ('Meals', 70.0),
-            'topOwed': [('Bob', 30.0)],
-            'pending': {'inProgress': {'count': 1, 'amount': 10.0}, 'underReview': {'count': 0, 'amount': 0.0}},
-        }
-        client = DummyClient('Summary text here.')
-        summary = summarizeForAI(metrics, client=client)
-        self.assertEqual(summary, 'Summary text here.')
-
 
 if __name__ == '__main__':
     unittest.main()